@@ -33,6 +33,8 @@ field_settings_path = f"{folder}/fields.settings.json"
 field_types_path = f"{folder}/fields.types.json"
 transformations_path = f"{folder}/fields.transformations.json"
 port = 8050
+sample_size = 100_000  # None to analyze the full dataset
+sample_seed = 42
 render_option = "interactive"
 # %%
 folder_path = FileOps.path_validator(filename)
@@ -52,14 +54,18 @@ field_settings = None
 with open(field_settings_path, encoding=encoding) as f:
     field_settings = json.load(f)
 # %%
-df = DatasetPreparator(
+preparator = DatasetPreparator(
     filename=filename,
     field_settings=field_settings,
     field_types=field_types,
     transformations=transformations,
     encoding=encoding,
     delimiter=delimiter,
-)(make_replacements=False, only_cast_transformations=True)
+    sample_size=sample_size,
+    sample_seed=sample_seed,
+    sample_cache_dir=folder,
+)
+df = preparator(make_replacements=False, only_cast_transformations=True)
 print("df shape", df.shape)
 # %%
 df.info(10)
@@ -68,6 +74,11 @@ print("removing empty fields")
 not_empty_fields = [field for field in df.columns if len(df[field].unique()) > 1]
 df = df[not_empty_fields]
 print("df shape", df.shape)
+# %% the sample keeps a minimum of rows for rare labels, this flags the rows that keep the
+# label proportions of the whole file
+proportional_field = "__proportional"
+if preparator.sampler is not None:
+    df[proportional_field] = preparator.sampler.proportional_mask
 # %%
 df_tmp = df.index.value_counts()
 has_more_than_one_record = (df_tmp > 1).any()
@@ -76,6 +87,10 @@ if has_more_than_one_record:
     df = df.sort_values(by=field_settings["date"][0], ascending=True).groupby(field_settings["index"][0]).tail()
 
 print("count of rows ", df.shape[0])
+# %%
+df_proportional = df
+if proportional_field in df.columns:
+    df_proportional = df[df.pop(proportional_field).to_numpy()]
 
 
 # %%
@@ -129,7 +144,7 @@ with tqdm(total=len(methods), ncols=120, desc="rendering correlations") as pbar:
     for i, method in enumerate(methods):
         pbar.set_description("rendering %s method" % method)
 
-        df_corr = get_correlation_dataframe(df, fields, field_settings, method)
+        df_corr = get_correlation_dataframe(df_proportional, fields, field_settings, method)
         corr_fig = px.imshow(
             df_corr,
             text_auto=True,
@@ -186,6 +201,8 @@ if has_more_than_one_record:
 
 # %%
 values = df[field_settings["label"][0]].value_counts()
+if preparator.sampler is not None:
+    values = preparator.sampler.label_counts
 components += [
     dbc.Row(
         [
@@ -235,7 +252,7 @@ fields = list(
 figs = []
 for method in ["pearson", "kendall", "spearman"]:
     fig = px.imshow(
-        get_correlation_dataframe(df, fields, field_settings, method),
+        get_correlation_dataframe(df_proportional, fields, field_settings, method),
         text_auto=True,
         aspect="auto",
         width=400,
@@ -53,8 +53,7 @@ def data_merge_dataset_files_command(
         with open(file, "r", encoding=encoding) as f:
             reader = csv.DictReader(f, delimiter=delimiter)
             field_names = reader.fieldnames
-            rows_count = len([row[0] for row in reader.reader])
-            click.echo(" - {file} ({cols}, {rows})".format(file=file, cols=len(field_names), rows=rows_count))
+            click.echo(" - {file} ({cols})".format(file=file, cols=len(field_names)))
             f.close()
 
     field_types = None
@@ -94,7 +93,7 @@ def data_merge_dataset_files_command(
     click.echo("")
     click.echo("mixing files...")
 
-    DatasetFilesMerger(
+    merger = DatasetFilesMerger(
         filenames=filenames,
         field_settings=field_settings,
         field_types=field_types,
@@ -103,4 +102,11 @@ def data_merge_dataset_files_command(
         encoding=encoding,
         delimiter=delimiter,
         save_intermediate=save_intermediate,
-    )()
+    )
+    merger()
+
+    click.echo("")
+    for file, rows_count in merger.rows_by_file.items():
+        click.echo(" - {file} ({rows})".format(file=file, rows=rows_count))
+    for stage in merger.stats:
+        click.echo(" - {stage}".format(stage=stage))
@@ -1,10 +1,12 @@
 import os
-from typing import List, Optional
+import time
+from typing import Dict, List, Optional
 
 import pandas as pd
-from pydantic import BaseModel, FilePath
+from pydantic import BaseModel, FilePath, PrivateAttr
 
 from app.data.preparation.dataset_preparator import DatasetPreparator
+from app.data.preparation.stage_stats import StageStats
 
 
 # This class merges multiple dataset files based on specified field settings, types, and
@@ -19,7 +21,23 @@ class DatasetFilesMerger(BaseModel):
     delimiter: Optional[str] = ","
     save_intermediate: Optional[bool] = False
 
+    _stats: Dict[str, StageStats] = PrivateAttr(default_factory=dict)
+    _rows_by_file: Dict[str, int] = PrivateAttr(default_factory=dict)
+
+    @property
+    def stats(self) -> List[StageStats]:
+        return list(self._stats.values())
+
+    @property
+    def rows_by_file(self) -> Dict[str, int]:
+        return dict(self._rows_by_file)
+
     def __call__(self) -> pd.DataFrame:
+        self._stats = {
+            name: StageStats(name=name) for name in ["read", "prepare", "write-intermediate", "merge", "write"]
+        }
+        self._rows_by_file = {}
+
         dfs = []
         for file in self.filenames:
 
@@ -29,17 +47,32 @@ class DatasetFilesMerger(BaseModel):
                 filename, ext = os.path.splitext(os.path.basename(file))
                 to_file = f"{dirname}/{filename}.transformed{ext}"
 
-            df_temp = DatasetPreparator(
+            preparator = DatasetPreparator(
                 filename=file,
                 field_settings=self.field_settings,
                 field_types=self.field_types,
                 transformations=self.transformations,
                 encoding=self.encoding,
                 delimiter=self.delimiter,
-            )(to_file=to_file)
+            )
+
+            started = time.perf_counter()
+            df_temp = preparator.read_dataframe()
+            self._stats["read"].add(len(df_temp), time.perf_counter() - started)
+            self._rows_by_file[str(file)] = len(df_temp)
+
+            started = time.perf_counter()
+            df_temp = preparator.prepare(df_temp)
+            self._stats["prepare"].add(len(df_temp), time.perf_counter() - started)
+
+            if to_file:
+                started = time.perf_counter()
+                df_temp.to_csv(to_file)
+                self._stats["write-intermediate"].add(len(df_temp), time.perf_counter() - started)
 
             dfs += [df_temp]
 
+        started = time.perf_counter()
         df = None
         if len(self.filenames) == 1:  # no group possible
             df = dfs[0]
@@ -50,6 +83,10 @@ class DatasetFilesMerger(BaseModel):
 
         if df is not None:
             df = df.sort_values(by=self.field_settings["date"][0], ascending=True)
+            self._stats["merge"].add(len(df), time.perf_counter() - started)
+
+            started = time.perf_counter()
             df.to_csv(self.merged_filename, encoding=self.encoding)
+            self._stats["write"].add(len(df), time.perf_counter() - started)
 
         return df
@@ -1,8 +1,9 @@
 from typing import List, Optional
 
 import pandas as pd
-from pydantic import BaseModel, FilePath
+from pydantic import BaseModel, FilePath, PrivateAttr
 
+from app.data.preparation.dataset_sampler import DatasetSampler
 from app.data.preparation.replacement.replacement_factory import ReplacementFactory
 from app.data.preparation.transformation.transformation_factory import TransformationFactory
 from app.data.preparation.transformation.transformation_operator import TransformationOperator
@@ -16,6 +17,21 @@ class DatasetPreparator(BaseModel):
     transformations: dict
     encoding: Optional[str] = "utf-8"
     delimiter: Optional[str] = ","
+    sample_size: Optional[int] = None
+    sample_seed: Optional[int] = 0
+    sample_min_per_label: Optional[int] = 100
+    sample_usecols: Optional[List[str]] = None
+    sample_cache_dir: Optional[str] = None
+
+    _sampler: Optional[DatasetSampler] = PrivateAttr(default=None)
+
+    @property
+    def sampler(self) -> Optional[DatasetSampler]:
+        """
+        Sampler used by the last call, it holds the label counts of the whole file and the
+        weights of the sampled rows; None when the whole file was read
+        """
+        return self._sampler
 
     def __call__(
         self,
@@ -25,8 +41,27 @@ class DatasetPreparator(BaseModel):
         only_cast_transformations: bool = True,
         to_file: FilePath = None,
     ) -> pd.DataFrame:
-        df = pd.read_csv(self.filename, encoding=self.encoding, delimiter=self.delimiter)
+        df = self.prepare(
+            self.read_dataframe(),
+            make_replacements=make_replacements,
+            make_transformations=make_transformations,
+            set_indexes=set_indexes,
+            only_cast_transformations=only_cast_transformations,
+        )
 
+        if to_file:
+            df.to_csv(to_file)
+
+        return df
+
+    def prepare(
+        self,
+        df: pd.DataFrame,
+        make_replacements: bool = True,
+        make_transformations: bool = True,
+        set_indexes: bool = True,
+        only_cast_transformations: bool = True,
+    ) -> pd.DataFrame:
         replacements_group = self.transformations["by_data_type"]
 
         for value_type in replacements_group:
@@ -53,11 +88,30 @@ class DatasetPreparator(BaseModel):
             if len(available_fields) > 0:
                 df.set_index(available_fields, inplace=True)
 
-        if to_file:
-            df.to_csv(to_file)
-
         return df
 
+    def read_dataframe(self) -> pd.DataFrame:
+        self._sampler = None
+        if not self.sample_size:
+            return pd.read_csv(self.filename, encoding=self.encoding, delimiter=self.delimiter)
+
+        # rows are sampled by index value, so every record of a sampled ID is kept
+        label_fields = self.field_settings["label"] if "label" in self.field_settings else []
+        index_fields = self.field_settings["index"] if "index" in self.field_settings else []
+        self._sampler = DatasetSampler(
+            filename=self.filename,
+            sample_size=self.sample_size,
+            label_field=label_fields[0] if len(label_fields) > 0 else None,
+            group_field=index_fields[0] if len(index_fields) > 0 else None,
+            min_per_label=self.sample_min_per_label,
+            seed=self.sample_seed,
+            usecols=self.sample_usecols,
+            cache_dir=self.sample_cache_dir,
+            encoding=self.encoding,
+            delimiter=self.delimiter,
+        )
+        return self._sampler()
+
     def apply_replacements(self, df: pd.DataFrame, fields: List[str], replacements_records: dict):
         replacement_factory = ReplacementFactory()
         for repl in replacements_records:
@@ -0,0 +1,346 @@
+import hashlib
+import io
+import json
+import os
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, FilePath, PrivateAttr
+
+KEY_FIELD = "__sample_key"
+ROW_FIELD = "__sample_row"
+STRATUM_FIELD = "__sample_stratum"
+UNIT_FIELD = "__sample_unit"
+
+
+# The `DatasetSampler` class draws a label-stratified sample from a dataset file while streaming
+# it in chunks, so exploratory analysis does not need to load the whole file in memory.
+#
+# Every row gets a uniform random key and, per label, only the rows with the smallest keys are
+# kept, which is equivalent to a reservoir sample of that label. When `group_field` is given the
+# sampled units are groups (e.g. every record of an ID) instead of rows: a first pass over the
+# group and label columns gives every group the label of its latest record as stratum, the groups
+# are selected by a hash of their value, and a second pass fetches all the rows of those groups.
+class DatasetSampler(BaseModel):
+    filename: FilePath
+    sample_size: int
+    label_field: Optional[str] = None
+    group_field: Optional[str] = None
+    min_per_label: Optional[int] = 100
+    seed: Optional[int] = 0
+    usecols: Optional[List[str]] = None
+    cache_dir: Optional[str] = None
+    chunk_size: Optional[int] = 100_000
+    encoding: Optional[str] = "utf-8"
+    delimiter: Optional[str] = ","
+
+    _label_counts: pd.Series = PrivateAttr(default=None)
+    _weights: np.ndarray = PrivateAttr(default=None)
+    _proportional_mask: np.ndarray = PrivateAttr(default=None)
+
+    @property
+    def label_counts(self) -> pd.Series:
+        """
+        Rows per label in the whole file, labels with the dtype `read_csv` gives the whole column
+        """
+        return self._label_counts
+
+    @property
+    def weights(self) -> np.ndarray:
+        """
+        Units of the file (rows, or groups when sampling by `group_field`) represented by every
+        sampled row, aligned by position with the sample
+        """
+        return self._weights
+
+    @property
+    def proportional_mask(self) -> np.ndarray:
+        """
+        Boolean mask, aligned by position with the sample, selecting a subset in which every
+        label keeps its proportion in the whole file (undoes the `min_per_label` oversampling)
+        """
+        return self._proportional_mask
+
+    def __call__(self) -> pd.DataFrame:
+        """
+        Returns `sample_size` rows (or the whole file when it is smaller), in file order. Labels
+        whose proportional share is below `min_per_label` keep that many rows, taken from the
+        share of the frequent ones. When sampling by `group_field` the quotas count groups, sized
+        so the sample holds about `sample_size` rows, so the result can be above or below it
+        """
+        cache_file = self.get_cache_file()
+        if cache_file and os.path.exists(cache_file):
+            return self.load(cache_file)
+
+        if self.group_field:
+            df = self.sample_groups()
+        else:
+            df = self.sample_rows()
+
+        if cache_file:
+            pd.to_pickle(
+                {
+                    "df": df,
+                    "label_counts": self._label_counts,
+                    "weights": self._weights,
+                    "proportional_mask": self._proportional_mask,
+                },
+                cache_file,
+            )
+
+        return df
+
+    def sample_rows(self) -> pd.DataFrame:
+        rng = np.random.default_rng(self.seed)
+        capacity = max(self.sample_size, self.min_per_label, 1)
+
+        reservoir = None
+        thresholds = pd.Series(dtype="float64")
+        pending = []
+        pending_rows = 0
+        counts = pd.Series(dtype="int64")
+        offset = 0
+
+        for chunk in self.read_chunks(self.get_usecols()):
+            chunk[KEY_FIELD] = rng.random(len(chunk))
+            chunk[ROW_FIELD] = np.arange(offset, offset + len(chunk))
+            offset += len(chunk)
+
+            counts = counts.add(self.get_labels(chunk).value_counts(dropna=False), fill_value=0)
+
+            # rows above the current k-th smallest key of their label can never enter the sample
+            chunk = self.select(chunk, thresholds)
+            pending += [chunk]
+            pending_rows += len(chunk)
+
+            # compacting once the pending rows match what the reservoir can hold keeps the
+            # sorting cost amortized
+            if pending_rows >= capacity * len(counts):
+                reservoir, thresholds = self.compact(reservoir, pending, capacity)
+                pending = []
+                pending_rows = 0
+
+        reservoir, _ = self.compact(reservoir, pending, capacity)
+        if reservoir is None:
+            return self.read_empty()
+
+        counts = counts.astype("int64")
+        quotas = self.get_quotas(counts, self.sample_size)
+        df = self.select(reservoir, self.get_thresholds(reservoir, quotas))
+        df = df.sort_values(by=ROW_FIELD).reset_index(drop=True)
+        df[STRATUM_FIELD] = self.get_labels(df)
+
+        return self.finish(df.rename(columns={ROW_FIELD: UNIT_FIELD}), counts, counts)
+
+    def sample_groups(self) -> pd.DataFrame:
+        key_fields = [field for field in [self.group_field, self.label_field] if field]
+
+        # first pass: latest label of every group and rows per label
+        groups = None
+        pending = []
+        pending_rows = 0
+        label_counts = pd.Series(dtype="int64")
+        rows_count = 0
+        for chunk in self.read_chunks(key_fields):
+            rows_count += len(chunk)
+            label_counts = label_counts.add(self.get_labels(chunk).value_counts(dropna=False), fill_value=0)
+
+            pending += [chunk.drop_duplicates(subset=self.group_field, keep="last")]
+            pending_rows += len(pending[-1])
+            if pending_rows >= max(self.chunk_size, 0 if groups is None else len(groups)):
+                groups = self.last_by_group(groups, pending)
+                pending = []
+                pending_rows = 0
+
+        groups = self.last_by_group(groups, pending)
+        if groups is None or len(groups) == 0:
+            return self.read_empty()
+
+        groups = groups.reset_index(drop=True)
+        groups[KEY_FIELD] = self.get_group_keys(groups[self.group_field])
+
+        counts = self.get_labels(groups).value_counts(dropna=False)
+        target = round(self.sample_size * len(groups) / rows_count)
+        quotas = self.get_quotas(counts, max(target, 1))
+        groups = self.select(groups, self.get_thresholds(groups, quotas))
+        groups = groups.set_index(self.group_field)
+
+        # second pass: every row of the selected groups
+        frames = []
+        for chunk in self.read_chunks(self.get_usecols()):
+            frames += [chunk[chunk[self.group_field].isin(groups.index)]]
+        df = pd.concat(frames, ignore_index=True)
+
+        df[KEY_FIELD] = df[self.group_field].map(groups[KEY_FIELD]).to_numpy()
+        df[STRATUM_FIELD] = self.get_labels(groups).reindex(df[self.group_field]).to_numpy()
+        df[UNIT_FIELD] = df[self.group_field].to_numpy()
+
+        return self.finish(df, counts, label_counts.astype("int64"))
+
+    def finish(self, df: pd.DataFrame, counts: pd.Series, label_counts: pd.Series) -> pd.DataFrame:
+        """
+        Computes the weights and the proportional mask of the sampled units, drops the helper
+        columns and gives the label and group columns the dtypes `read_csv` would infer
+        """
+        strata = df[STRATUM_FIELD]
+        units = df[[UNIT_FIELD, STRATUM_FIELD, KEY_FIELD]].drop_duplicates(subset=UNIT_FIELD)
+        selected = units[STRATUM_FIELD].value_counts(dropna=False).reindex(counts.index, fill_value=0)
+
+        self._weights = (counts / selected).reindex(strata).to_numpy()
+
+        ratio = (selected / counts).min()
+        keep = (counts * ratio).round()
+        ranks = units.groupby(STRATUM_FIELD, dropna=False)[KEY_FIELD].rank(method="first")
+        kept = units[UNIT_FIELD][(ranks <= keep.reindex(units[STRATUM_FIELD]).to_numpy()).to_numpy()]
+        self._proportional_mask = df[UNIT_FIELD].isin(kept).to_numpy()
+
+        df = df.drop(columns=[UNIT_FIELD, KEY_FIELD, STRATUM_FIELD])
+
+        self._label_counts = label_counts
+        if self.label_field and self.label_field in df.columns:
+            # labels are parsed over every value of the file, so the dtype matches a full read
+            parsed = self.parse_values(pd.Series(label_counts.index))
+            self._label_counts = pd.Series(label_counts.to_numpy(), index=parsed.to_numpy(), name="count")
+            values = pd.Series(parsed.to_numpy(), index=label_counts.index)
+            df[self.label_field] = df[self.label_field].map(values).astype(parsed.dtype)
+
+        if self.group_field and self.group_field in df.columns:
+            df[self.group_field] = self.parse_values(df[self.group_field]).to_numpy()
+
+        return df
+
+    def read_chunks(self, usecols: Optional[List[str]]):
+        # label and group values are read as text, so a value is the same stratum in every chunk
+        # regardless of the dtype pandas would infer for that chunk
+        key_fields = [field for field in [self.label_field, self.group_field] if field]
+        return pd.read_csv(
+            self.filename,
+            encoding=self.encoding,
+            delimiter=self.delimiter,
+            usecols=usecols,
+            dtype={field: str for field in key_fields},
+            chunksize=self.chunk_size,
+        )
+
+    def read_empty(self) -> pd.DataFrame:
+        return pd.read_csv(
+            self.filename, encoding=self.encoding, delimiter=self.delimiter, usecols=self.get_usecols(), nrows=0
+        )
+
+    def get_usecols(self) -> Optional[List[str]]:
+        if self.usecols is None:
+            return None
+        key_fields = [field for field in [self.label_field, self.group_field] if field]
+        return list(dict.fromkeys(self.usecols + key_fields))
+
+    def get_group_keys(self, values: pd.Series) -> np.ndarray:
+        hash_key = str(self.seed).rjust(16, "0")[-16:]
+        hashes = pd.util.hash_pandas_object(values, index=False, hash_key=hash_key)
+        return hashes.to_numpy() / np.float64(2**64)
+
+    def get_labels(self, df: pd.DataFrame) -> pd.Series:
+        if self.label_field and self.label_field in df.columns:
+            return df[self.label_field]
+        return pd.Series(0, index=df.index)
+
+    def last_by_group(self, groups: Optional[pd.DataFrame], pending: List[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        frames = ([groups] if groups is not None else []) + pending
+        if len(frames) == 0:
+            return None
+        return pd.concat(frames, ignore_index=True).drop_duplicates(subset=self.group_field, keep="last")
+
+    def get_thresholds(self, df: pd.DataFrame, limits: pd.Series) -> pd.Series:
+        """
+        Key of the `limit`-th smallest row of every label, labels with fewer rows than their
+        limit get no threshold
+        """
+        ranks = pd.DataFrame({"label": self.get_labels(df).to_numpy(), "key": df[KEY_FIELD].to_numpy()})
+        ranks = ranks.sort_values(by="key")
+        ranks["rank"] = ranks.groupby("label", dropna=False).cumcount()
+        ranks["limit"] = limits.reindex(ranks["label"]).to_numpy()
+
+        thresholds = ranks[ranks["rank"] == ranks["limit"] - 1].set_index("label")["key"]
+        empty = limits[limits == 0]
+        return pd.concat([thresholds, pd.Series(-1.0, index=empty.index)])
+
+    def select(self, df: pd.DataFrame, thresholds: pd.Series) -> pd.DataFrame:
+        if len(thresholds) == 0:
+            return df
+        limit = thresholds.reindex(self.get_labels(df)).to_numpy()
+        # labels without a threshold compare as False against NaN and are kept
+        return df[~(df[KEY_FIELD].to_numpy() > limit)]
+
+    def compact(self, reservoir: Optional[pd.DataFrame], pending: List[pd.DataFrame], capacity: int):
+        frames = ([reservoir] if reservoir is not None else []) + pending
+        if len(frames) == 0:
+            return None, pd.Series(dtype="float64")
+
+        df = pd.concat(frames, ignore_index=True)
+        labels = self.get_labels(df)
+        limits = pd.Series(capacity, index=labels.drop_duplicates())
+        thresholds = self.get_thresholds(df, limits)
+        return self.select(df, thresholds), thresholds
+
+    def get_quotas(self, counts: pd.Series, target: int) -> pd.Series:
+        """
+        Splits the target across labels proportionally to their frequency, labels whose share
+        would be below `min_per_label` get that many units (or all of them when they have fewer)
+        so rare classes are not lost in the sample, the quotas always add up to the target
+        """
+        if target >= counts.sum():
+            return counts.astype("int64")
+
+        floor = min(self.min_per_label, target // len(counts))
+        floored = pd.Series(False, index=counts.index)
+        while True:
+            free = counts[~floored]
+            remaining = target - counts[floored].clip(upper=floor).sum()
+            shares = free / free.sum() * remaining if len(free) > 0 else free.astype("float64")
+            low = shares < floor
+            if not low.any():
+                break
+            floored[low[low].index] = True
+
+        quotas = counts.clip(upper=floor).where(floored, np.floor(shares).reindex(counts.index))
+        quotas = quotas.clip(upper=counts).astype("int64")
+
+        # hand out what rounding left, capped by the units every label has
+        remaining = target - quotas.sum()
+        while remaining > 0:
+            room = counts - quotas
+            room = room[room > 0]
+            shares = room / room.sum() * remaining
+            extra = np.floor(shares).astype("int64")
+            if extra.sum() == 0:
+                extra[(shares - extra).idxmax()] = 1
+            quotas = quotas.add(extra.clip(upper=room), fill_value=0).astype("int64")
+            remaining = target - quotas.sum()
+
+        return quotas
+
+    def parse_values(self, values: pd.Series) -> pd.Series:
+        """
+        Parses text values with `read_csv`, so they get the dtype it infers for a column
+        """
+        text = values.to_frame(name="value").to_csv(index=False)
+        return pd.read_csv(io.StringIO(text))["value"]
+
+    def get_cache_file(self) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+
+        stat = os.stat(self.filename)
+        settings = self.model_dump(mode="json", exclude={"cache_dir", "chunk_size"})
+        settings["file"] = {"size": stat.st_size, "modified": stat.st_mtime}
+        digest = hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:16]
+
+        filename, _ = os.path.splitext(os.path.basename(self.filename))
+        return os.path.join(self.cache_dir, f"{filename}.sample-{digest}.pkl")
+
+    def load(self, cache_file: str) -> pd.DataFrame:
+        cached = pd.read_pickle(cache_file)
+        self._label_counts = cached["label_counts"]
+        self._weights = cached["weights"]
+        self._proportional_mask = cached["proportional_mask"]
+        return cached["df"]
@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+
+
+# The `StageStats` class accumulates throughput counters (items, rows and busy time) for a single
+# stage of a process, an item is whatever the stage handles at once (e.g. a file).
+class StageStats(BaseModel):
+    name: str
+    items: int = 0
+    rows: int = 0
+    busy_seconds: float = 0.0
+
+    def add(self, rows: int, seconds: float):
+        self.items += 1
+        self.rows += rows
+        self.busy_seconds += seconds
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.busy_seconds if self.busy_seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        return "{name}: {rows} rows in {items} items, {seconds:.2f}s busy ({rate:.0f} rows/s)".format(
+            name=self.name,
+            rows=self.rows,
+            items=self.items,
+            seconds=self.busy_seconds,
+            rate=self.rows_per_second,
+        )